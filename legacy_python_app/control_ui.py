@@ -1,30 +1,186 @@
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QPlainTextEdit, QLineEdit,
-    QHBoxLayout, QLabel, QGroupBox, QGraphicsDropShadowEffect
+    QHBoxLayout, QLabel, QGroupBox
 )
-from PyQt5.QtCore import QFileSystemWatcher, QTimer
-from PyQt5.QtGui import QDesktopServices, QColor
+from PyQt5.QtCore import QFileSystemWatcher, QSocketNotifier, QTimer
+from PyQt5.QtGui import QDesktopServices, QTextCursor
+import codecs
+import dotenv
+import functools
+import itertools
 import os
-from dotenv import load_dotenv
+import shutil
 import subprocess
-import os
+import sys
+import tempfile
 from src.utils.logger import logger
 
 
+# 界面样式表：所有规则集中于此，启动时只解析一次
+_QSS = """
+    QWidget {
+        background-color: #f0f2f5;
+        font-family: 'Segoe UI', sans-serif;
+        font-size: 14px;
+    }
+    QGroupBox {
+        background-color: white;
+        border-radius: 8px;
+        padding: 15px;
+        margin-top: 20px;
+    }
+    QLineEdit {
+        padding: 8px;
+        border: 1px solid #ccc;
+        border-radius: 4px;
+        background-color: white;
+    }
+    QPushButton {
+        padding: 8px 16px;
+        border: none;
+        border-radius: 6px;
+        background-color: #2196F3;
+        color: white;
+        min-width: 80px;
+        font-weight: 500;
+    }
+    QPushButton:hover {
+        background-color: #1976D2;
+    }
+    QPushButton:disabled {
+        background-color: #90CAF9;
+    }
+    QPlainTextEdit {
+        background-color: white;
+        border: 1px solid #ccc;
+        border-radius: 6px;
+        padding: 12px;
+        font-family: 'Consolas', monospace;
+        font-size: 12px;
+    }
+    QPlainTextEdit:focus {
+        border-color: #2196F3;
+        background-color: #fafafa;
+    }
+    QLabel {
+        color: #666;
+        font-weight: 500;
+    }
+    
+    /* 加载动画 */
+    QProgressBar {
+        border: 1px solid #ccc;
+        border-radius: 4px;
+        text-align: center;
+        background-color: white;
+    }
+    QProgressBar::chunk {
+        background-color: #2196F3;
+        border-radius: 2px;
+    }
+
+    QGroupBox#apiKeyGroup {
+        border: 1px solid #ddd;
+        border-radius: 6px;
+        margin-top: 10px;
+        padding-top: 15px;
+    }
+    QGroupBox#apiKeyGroup::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 3px;
+        color: #666;
+    }
+
+    QLineEdit#apiKeyInput {
+        background-color: white;
+        padding: 10px;
+        border: 2px solid #ddd;
+        border-radius: 6px;
+        font-size: 14px;
+    }
+    QLineEdit#apiKeyInput:focus {
+        border-color: #2196F3;
+    }
+
+    QPushButton#keyLinkBtn {
+        color: #2196F3;
+        text-decoration: none;
+        background: transparent;
+        border: none;
+        padding: 0;
+        text-align: left;
+    }
+    QPushButton#keyLinkBtn:hover {
+        color: #1976D2;
+        text-decoration: underline;
+    }
+
+    QPushButton#saveBtn {
+        background-color: #4CAF50;
+        padding: 2px;
+        font-size: 11px;
+        margin-left: 10px;
+    }
+    QPushButton#saveBtn:hover {
+        background-color: #388E3C;
+    }
+
+    QPushButton#stopBtn {
+        background-color: #F44336;
+    }
+    QPushButton#stopBtn:hover {
+        background-color: #D32F2F;
+    }
+
+    QPlainTextEdit#logView {
+        background-color: #2d2d2d;
+        color: #f5f5f5;
+        border: 1px solid #444;
+        border-radius: 4px;
+        padding: 10px;
+        font-family: 'Consolas', monospace;
+        font-size: 12px;
+    }
+    QPlainTextEdit#logView:hover {
+        border-color: #666;
+    }
+    QPlainTextEdit#logView QScrollBar:vertical {
+        background: #444;
+        width: 10px;
+        margin: 0px 0px 0px 0px;
+    }
+    QPlainTextEdit#logView QScrollBar::handle:vertical {
+        background: #666;
+        min-height: 20px;
+        border-radius: 5px;
+    }
+    QPlainTextEdit#logView QScrollBar::add-line:vertical,
+    QPlainTextEdit#logView QScrollBar::sub-line:vertical {
+        background: none;
+    }
+"""
+
+
+def _read_api_key(path='.env'):
+    """按 dotenv 的语法解析.env，只取 SILICONFLOW_API_KEY，文件或键不存在时返回 None"""
+    return dotenv.dotenv_values(path).get('SILICONFLOW_API_KEY')
+
+
 class ControlUI(QWidget):
+    LOG_READ_SIZE = 65536  # 每次读取日志的块大小（字节）
+
     def __init__(self):
         super().__init__()
         
-        # 初始化环境变量监控
+        # 初始化环境变量监控，编辑器保存时的连续通知合并为一次重新加载
+        self._env_reload_timer = QTimer(self)
+        self._env_reload_timer.setSingleShot(True)
+        self._env_reload_timer.setInterval(200)
+        self._env_reload_timer.timeout.connect(self.reload_env)
         self.env_watcher = QFileSystemWatcher(['.env'])
-        self.env_watcher.fileChanged.connect(self.reload_env)
+        self.env_watcher.fileChanged.connect(self._env_reload_timer.start)
         
-        # 清空日志文件
-        if not os.path.exists('logs'):
-            os.makedirs('logs')
-        with open('logs/app.log', 'w') as f:
-            f.truncate(0)
-            
         logger.info("初始化控制界面")
         
         # 初始化环境变量
@@ -36,20 +192,24 @@ class ControlUI(QWidget):
         # 加载环境变量
         self.reload_env()
         
-        # 初始化进程
+        # 初始化进程及其输出管道的监听
         self.process = None
+        self._output_notifier = None
+        self._output_decoder = None
         
-        # 初始化日志监控
-        self.log_watcher = QFileSystemWatcher(['logs/app.log'])
-        self.log_watcher.fileChanged.connect(self.update_log_view)
+        # 初始化日志监控（仅依赖文件变化通知，主程序启动后才开始监听）
+        self.log_watcher = QFileSystemWatcher()
+        self.log_watcher.fileChanged.connect(self._schedule_log_update)
+        self.log_watcher.directoryChanged.connect(self._schedule_log_update)
+        self._log_update_pending = False
+        self._log_tailing = False
         
-        # 记录日志文件读取位置
+        # 日志文件句柄，记录读取位置、inode 及未换行的残余内容
+        self._log_fh = None
+        self._log_ino = None
         self._log_file_pos = 0
-        
-        # 初始化定时器
-        self.log_timer = QTimer()
-        self.log_timer.timeout.connect(self.update_log_view)
-        self.log_timer.start(500)  # 每500ms更新一次
+        self._log_partial = ''
+        self._log_missing_shown = False  # 日志缺失提示只显示一次
         
     def init_ui(self):
         """初始化界面"""
@@ -57,92 +217,7 @@ class ControlUI(QWidget):
         self.setGeometry(300, 300, 800, 600)
         
         # 设置窗口样式
-        # 设置窗口阴影效果
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setXOffset(5)
-        shadow.setYOffset(5)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        self.setGraphicsEffect(shadow)
-        
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #f0f2f5;
-                font-family: 'Segoe UI', sans-serif;
-                font-size: 14px;
-            }
-            QGroupBox {
-                background-color: white;
-                border-radius: 8px;
-                padding: 15px;
-                margin-top: 20px;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-                transition: all 0.2s ease;
-            }
-            QGroupBox:hover {
-                box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-                transform: translateY(-1px);
-            }
-            QLineEdit {
-                padding: 8px;
-                border: 1px solid #ccc;
-                border-radius: 4px;
-                background-color: white;
-            }
-            QPushButton {
-                padding: 8px 16px;
-                border: none;
-                border-radius: 6px;
-                background-color: #2196F3;
-                color: white;
-                min-width: 80px;
-                transition: all 0.2s ease;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #1976D2;
-                transform: translateY(-1px);
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }
-            QPushButton:pressed {
-                transform: translateY(0);
-                box-shadow: none;
-            }
-            QPushButton:disabled {
-                background-color: #90CAF9;
-                opacity: 0.7;
-            }
-            QPlainTextEdit {
-                background-color: white;
-                border: 1px solid #ccc;
-                border-radius: 6px;
-                padding: 12px;
-                font-family: 'Consolas', monospace;
-                font-size: 12px;
-                transition: all 0.2s ease;
-            }
-            QPlainTextEdit:focus {
-                border-color: #2196F3;
-                box-shadow: 0 0 0 2px rgba(33,150,243,0.2);
-                background-color: #fafafa;
-            }
-            QLabel {
-                color: #666;
-                font-weight: 500;
-            }
-            
-            /* 加载动画 */
-            QProgressBar {
-                border: 1px solid #ccc;
-                border-radius: 4px;
-                text-align: center;
-                background-color: white;
-            }
-            QProgressBar::chunk {
-                background-color: #2196F3;
-                border-radius: 2px;
-            }
-        """)
+        self.setStyleSheet(_QSS)
         
         # 创建布局
         layout = QVBoxLayout()
@@ -151,38 +226,14 @@ class ControlUI(QWidget):
         
         # 创建API Key分组框
         api_key_group = QGroupBox("API Key 设置")
-        api_key_group.setStyleSheet("""
-            QGroupBox {
-                border: 1px solid #ddd;
-                border-radius: 6px;
-                margin-top: 10px;
-                padding-top: 15px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 3px;
-                color: #666;
-            }
-        """)
+        api_key_group.setObjectName("apiKeyGroup")
         api_key_layout = QVBoxLayout()
         
         # 创建API Key输入框
         self.api_key_input = QLineEdit()
         self.api_key_input.setPlaceholderText("请输入SILICONFLOW API Key")
         self.api_key_input.setText(self.api_key)
-        self.api_key_input.setStyleSheet("""
-            QLineEdit {
-                background-color: white;
-                padding: 10px;
-                border: 2px solid #ddd;
-                border-radius: 6px;
-                font-size: 14px;
-            }
-            QLineEdit:focus {
-                border-color: #2196F3;
-            }
-        """)
+        self.api_key_input.setObjectName("apiKeyInput")
         api_key_layout.addWidget(self.api_key_input)
 
         # 创建获取Key的链接和保存按钮
@@ -190,20 +241,7 @@ class ControlUI(QWidget):
         key_link_layout.setSpacing(10)
         key_link_layout.addWidget(QLabel("获取key"))
         self.key_link_btn = QPushButton("https://cloud.siliconflow.cn/account/ak")
-        self.key_link_btn.setStyleSheet("""
-            QPushButton {
-                color: #2196F3;
-                text-decoration: none;
-                background: transparent;
-                border: none;
-                padding: 0;
-                text-align: left;
-            }
-            QPushButton:hover {
-                color: #1976D2;
-                text-decoration: underline;
-            }
-        """)
+        self.key_link_btn.setObjectName("keyLinkBtn")
         self.key_link_btn.setFlat(True)
         self.key_link_btn.clicked.connect(self.open_key_url)
         key_link_layout.addWidget(self.key_link_btn)
@@ -213,17 +251,7 @@ class ControlUI(QWidget):
         self.save_btn.setFixedWidth(60)  # 缩小按钮宽度
         self.save_btn.setFixedHeight(24)  # 设置固定高度
         self.save_btn.clicked.connect(self.save_settings)
-        self.save_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                padding: 2px;
-                font-size: 11px;
-                margin-left: 10px;
-            }
-            QPushButton:hover {
-                background-color: #388E3C;
-            }
-        """)
+        self.save_btn.setObjectName("saveBtn")
         key_link_layout.addWidget(self.save_btn)
         api_key_layout.addLayout(key_link_layout)
         api_key_group.setLayout(api_key_layout)
@@ -242,14 +270,7 @@ class ControlUI(QWidget):
         self.stop_btn = QPushButton('关闭')
         self.stop_btn.clicked.connect(self.stop_main)
         self.stop_btn.setEnabled(False)
-        self.stop_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #F44336;
-            }
-            QPushButton:hover {
-                background-color: #D32F2F;
-            }
-        """)
+        self.stop_btn.setObjectName("stopBtn")
         button_layout.addWidget(self.stop_btn)
         
         layout.addLayout(button_layout)
@@ -257,35 +278,9 @@ class ControlUI(QWidget):
         # 创建日志显示区域
         self.log_view = QPlainTextEdit()
         self.log_view.setReadOnly(True)
-        self.log_view.setStyleSheet("""
-            QPlainTextEdit {
-                background-color: #2d2d2d;
-                color: #f5f5f5;
-                border: 1px solid #444;
-                border-radius: 4px;
-                padding: 10px;
-                font-family: 'Consolas', monospace;
-                font-size: 12px;
-                transition: all 0.2s ease;
-            }
-            QPlainTextEdit:hover {
-                border-color: #666;
-            }
-            QScrollBar:vertical {
-                background: #444;
-                width: 10px;
-                margin: 0px 0px 0px 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #666;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::add-line:vertical,
-            QScrollBar::sub-line:vertical {
-                background: none;
-            }
-        """)
+        self.log_view.setMaximumBlockCount(5000)  # 限制保留的日志行数
+        self._log_cursor = self.log_view.textCursor()
+        self.log_view.setObjectName("logView")
         layout.addWidget(self.log_view)
         
         self.setLayout(layout)
@@ -303,10 +298,18 @@ class ControlUI(QWidget):
 
     def reload_env(self):
         """重新加载.env文件"""
-        load_dotenv(override=True)
+        api_key = _read_api_key()
+        if api_key is not None:
+            # 同步到环境变量，供启动的子进程继承
+            os.environ['SILICONFLOW_API_KEY'] = api_key
         self.api_key = os.getenv('SILICONFLOW_API_KEY', '')
-        # 更新UI中的API Key显示
-        self.api_key_input.setText(self.api_key)
+        # 更新UI中的API Key显示，值未变化时不重设，避免光标跳动和重绘
+        if self.api_key_input.text() != self.api_key:
+            self.api_key_input.setText(self.api_key)
+        
+        # 原子替换保存后 QFileSystemWatcher 会丢失监控，需要重新添加
+        if '.env' not in self.env_watcher.files() and os.path.exists('.env'):
+            self.env_watcher.addPath('.env')
 
     def open_key_url(self):
         """打开获取API Key的URL"""
@@ -319,29 +322,35 @@ class ControlUI(QWidget):
             self.log_view.setPlainText("API Key不能为空")
             return
             
+        tmp_path = None
         try:
-            # 读取现有.env内容
-            env_lines = []
+            # 单次流式改写到临时文件，完成后原子替换.env
+            replaced = False
+            with tempfile.NamedTemporaryFile('w', dir='.', prefix='.env.', delete=False) as dst:
+                tmp_path = dst.name
+                if os.path.exists('.env'):
+                    with open('.env', 'r') as src:
+                        for line in src:
+                            if line.startswith('SILICONFLOW_API_KEY='):
+                                dst.write(f'SILICONFLOW_API_KEY={api_key}\n')
+                                replaced = True
+                            else:
+                                dst.write(line)
+                if not replaced:
+                    dst.write(f'\nSILICONFLOW_API_KEY={api_key}\n')
+            # 临时文件创建时权限为 0600，替换前沿用原文件的权限
             if os.path.exists('.env'):
-                with open('.env', 'r') as f:
-                    env_lines = f.readlines()
-            
-            # 更新或添加SILICONFLOW_API_KEY
-            found = False
-            with open('.env', 'w') as f:
-                for line in env_lines:
-                    if line.startswith('SILICONFLOW_API_KEY='):
-                        f.write(f'SILICONFLOW_API_KEY={api_key}\n')
-                        found = True
-                    else:
-                        f.write(line)
-                if not found:
-                    f.write(f'\nSILICONFLOW_API_KEY={api_key}\n')
+                shutil.copymode('.env', tmp_path)
+            os.replace(tmp_path, '.env')
+            tmp_path = None
                     
             self.log_view.setPlainText("设置保存成功")
             self.reload_env()  # 重新加载环境变量
         except Exception as e:
             self.log_view.setPlainText(f"保存失败：{str(e)}")
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
 
     def start_main(self):
         """启动main.py"""
@@ -353,8 +362,21 @@ class ControlUI(QWidget):
             return
             
         if self.process is None:
+            # 使用当前解释器启动，保证与控制界面处于同一虚拟环境
+            if os.name == 'posix':
+                # 通过管道直接读取子进程输出，不再经由日志文件中转
+                self.process = subprocess.Popen(
+                    [sys.executable, "main.py"],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    env={**os.environ, 'NO_COLOR': '1', 'PYTHONUNBUFFERED': '1'},
+                )
+                self._start_output_reader()
+            else:
+                # Windows 的匿名管道无法交给 QSocketNotifier 监听，继续跟踪日志文件
+                self._start_log_tail()
+                self.process = subprocess.Popen([sys.executable, "main.py"])
             logger.info("启动主程序")
-            self.process = subprocess.Popen(["python", "main.py"])
             self.start_btn.setEnabled(False)
             self.stop_btn.setEnabled(True)
             
@@ -365,37 +387,176 @@ class ControlUI(QWidget):
         """停止main.py"""
         if self.process is not None:
             logger.info("停止主程序")
-            self.process.terminate()
-            self.process = None
+            self.update_log_view()
+            
+            # 先关闭输出管道，避免子进程阻塞在写满的管道上无法退出
+            self._stop_output_reader()
+            self._stop_log_tail()
+            process, self.process = self.process, None
+            process.terminate()
+            
+            # 给子进程留出退出时间，超时仍未退出再强制结束，期间界面不阻塞
+            QTimer.singleShot(2000, functools.partial(self._ensure_killed, process))
             self.start_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
     
+    def _ensure_killed(self, process):
+        """强制结束未响应终止信号的子进程，并回收以免残留僵尸进程"""
+        if process.poll() is None:
+            logger.warning("主程序未响应终止信号，强制结束")
+            process.kill()
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            logger.error(f"无法结束主程序进程 (pid: {process.pid})")
+    
+    def _start_output_reader(self):
+        """监听子进程输出管道，有数据可读时才读取"""
+        self._log_partial = ''
+        self._output_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._output_notifier = QSocketNotifier(
+            self.process.stdout.fileno(), QSocketNotifier.Read, self
+        )
+        self._output_notifier.activated.connect(self._read_process_output)
+    
+    def _read_process_output(self):
+        """读取管道中已到达的输出并追加到日志视图"""
+        data = os.read(self.process.stdout.fileno(), self.LOG_READ_SIZE)
+        if not data:
+            # 子进程已退出并关闭了管道，写出最后不完整的一行
+            self._output_notifier.setEnabled(False)
+            self._drain_process_output()
+            return
+        text = self._output_decoder.decode(data)
+        if text:
+            self._append_log_chunks([text])
+    
+    def _drain_process_output(self):
+        """不阻塞地读完管道中已到达的输出，并写出解码器和残余行中剩下的内容"""
+        fd = self.process.stdout.fileno()
+        os.set_blocking(fd, False)
+        chunks = []
+        try:
+            for data in iter(functools.partial(os.read, fd, self.LOG_READ_SIZE), b''):
+                chunks.append(self._output_decoder.decode(data))
+        except BlockingIOError:
+            pass
+        chunks.append(self._output_decoder.decode(b'', final=True))
+        self._append_log_chunks(chunks)
+        if self._log_partial:
+            self._append_log_chunks(['\n'])
+    
+    def _stop_output_reader(self):
+        """停止监听，读完剩余输出后关闭子进程输出管道"""
+        if self._output_notifier is not None:
+            self._output_notifier.setEnabled(False)
+            self._output_notifier.deleteLater()
+            self._output_notifier = None
+        if self.process.stdout is not None:
+            if not self.process.stdout.closed:
+                self._drain_process_output()
+            self.process.stdout.close()
+    
+    def _start_log_tail(self):
+        """开始跟踪日志：从文件当前末尾读起，并监听文件变化"""
+        self._log_tailing = True
+        try:
+            self._open_log()
+        except FileNotFoundError:
+            # 日志文件由主程序首次写入时才创建，先监听目录，文件出现后再切换为监听文件
+            os.makedirs('logs', exist_ok=True)
+            self.log_watcher.addPath('logs')
+            return
+        self._log_fh.seek(0, os.SEEK_END)
+        self._log_file_pos = self._log_fh.tell()
+        self.log_watcher.addPath('logs/app.log')
+    
+    def _stop_log_tail(self):
+        """停止跟踪日志并释放文件句柄，主程序未运行时不做任何日志 I/O"""
+        self._log_tailing = False
+        watched = self.log_watcher.files() + self.log_watcher.directories()
+        if watched:
+            self.log_watcher.removePaths(watched)
+        if self._log_fh is not None:
+            self._log_fh.close()
+            self._log_fh = None
+    
+    def _schedule_log_update(self):
+        """合并短时间内的多次文件变化通知，延迟刷新日志显示"""
+        if self._log_update_pending:
+            return
+        self._log_update_pending = True
+        QTimer.singleShot(50, self.update_log_view)
+
+    def _open_log(self):
+        """（重新）打开日志文件并记录其 inode，用于检测轮转"""
+        if self._log_fh is not None:
+            self._log_fh.close()
+        self._log_fh = open('logs/app.log', 'r', buffering=1, encoding='utf-8', errors='replace')
+        self._log_ino = os.fstat(self._log_fh.fileno()).st_ino
+        self._log_file_pos = 0
+        self._log_partial = ''
+
+    def _append_log_chunks(self, chunks):
+        """追加文本块到日志视图，只输出完整的行，残余部分留到下次"""
+        scrollbar = self.log_view.verticalScrollBar()
+        at_bottom = scrollbar.value() == scrollbar.maximum()
+        
+        # 批量插入期间暂停重绘，整批只触发一次布局和刷新
+        self.log_view.setUpdatesEnabled(False)
+        try:
+            for chunk in chunks:
+                complete, newline, self._log_partial = (self._log_partial + chunk).rpartition('\n')
+                if newline:
+                    self._log_cursor.movePosition(QTextCursor.End)
+                    self._log_cursor.insertText(complete + '\n')
+        finally:
+            self.log_view.setUpdatesEnabled(True)
+        
+        # 仅当用户停留在底部时才自动滚动，便于向上翻看历史日志
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def _drain_log(self):
+        """按块读取日志文件的新增内容"""
+        read_chunk = functools.partial(self._log_fh.read, self.LOG_READ_SIZE)
+        chunk = read_chunk()
+        if chunk:
+            self._append_log_chunks(itertools.chain([chunk], iter(read_chunk, '')))
+        self._log_file_pos = self._log_fh.tell()
+
     def update_log_view(self):
         """实时更新日志显示"""
+        self._log_update_pending = False
+        if not self._log_tailing:
+            return
+        
         try:
-            with open('logs/app.log', 'r') as f:
-                # 跳转到上次读取位置
-                f.seek(self._log_file_pos)
-                
-                # 读取新增内容
-                new_content = f.read()
-                
-                # 更新文件位置
-                self._log_file_pos = f.tell()
-                
-                # 如果文件被清空或轮转，重置位置
-                if self._log_file_pos > os.path.getsize('logs/app.log'):
-                    self._log_file_pos = 0
-                    new_content = f.read()
-                
-                # 追加新内容到日志视图
-                if new_content:
-                    self.log_view.appendPlainText(new_content)
-                    self.log_view.verticalScrollBar().setValue(
-                        self.log_view.verticalScrollBar().maximum()
-                    )
+            if self._log_fh is None:
+                self._open_log()
+            elif not self.log_watcher.files():
+                # 文件被重命名或删除时 Qt 会丢失监控，此时才按路径确认是否已轮转
+                if os.stat('logs/app.log').st_ino != self._log_ino:
+                    # 日志已轮转：先读完旧文件剩余内容，再切换到新文件
+                    self._drain_log()
+                    self._open_log()
+            elif os.fstat(self._log_fh.fileno()).st_size < self._log_file_pos:
+                # 日志被清空，从头读取
+                self._open_log()
+            
+            self._drain_log()
+            self._log_missing_shown = False
         except FileNotFoundError:
-            self.log_view.setPlainText('日志文件不存在')
+            if not self._log_missing_shown:
+                self.log_view.setPlainText('日志文件不存在')
+                self._log_missing_shown = True
+        
+        # 文件被替换或轮转后 QFileSystemWatcher 会丢失监控，需要重新添加
+        if not self.log_watcher.files() and os.path.exists('logs/app.log'):
+            self.log_watcher.addPath('logs/app.log')
+        # 文件已打开后不再需要监听目录
+        if self._log_fh is not None and self.log_watcher.directories():
+            self.log_watcher.removePaths(self.log_watcher.directories())
 
 if __name__ == "__main__":
     app = QApplication([])
@@ -1,9 +1,9 @@
 import os
 import sys
 
-from dotenv import load_dotenv
+from src.utils.env import ensure_env_loaded
 
-load_dotenv()
+ensure_env_loaded()
 
 from src.audio.recorder import AudioRecorder
 from src.keyboard.listener import KeyboardManager, check_accessibility_permissions
@@ -30,19 +30,19 @@ class VoiceAssistant:
         self.audio_recorder = AudioRecorder()
         self.audio_processor = audio_processor
         self.keyboard_manager = KeyboardManager(
-            on_record_start=self.start_transcription_recording,
+            on_record_start=self.audio_recorder.start_recording,
             on_record_stop=self.stop_transcription_recording,
-            on_translate_start=self.start_translation_recording,
+            on_translate_start=self.audio_recorder.start_recording,
             on_translate_stop=self.stop_translation_recording,
             on_reset_state=self.reset_state
         )
     
-    def start_transcription_recording(self):
-        """开始录音（转录模式）"""
-        self.audio_recorder.start_recording()
-    
-    def stop_transcription_recording(self):
-        """停止录音并处理（转录模式）"""
+    def _stop_recording(self, mode):
+        """停止录音并处理
+
+        Args:
+            mode: 'transcriptions' 或 'translations'，决定是转录还是翻译
+        """
         audio = self.audio_recorder.stop_recording()
         if audio == "TOO_SHORT":
             logger.warning("录音时长太短，状态将重置")
@@ -50,8 +50,9 @@ class VoiceAssistant:
         elif audio:
             result = self.audio_processor.process_audio(
                 audio,
-                mode="transcriptions",
-                prompt=""
+                mode=mode,
+                prompt="",
+                on_delta=self.keyboard_manager.type_delta
             )
             # 解构返回值
             text, error = result if isinstance(result, tuple) else (result, None)
@@ -60,27 +61,13 @@ class VoiceAssistant:
             logger.error("没有录音数据，状态将重置")
             self.keyboard_manager.reset_state()
     
-    def start_translation_recording(self):
-        """开始录音（翻译模式）"""
-        self.audio_recorder.start_recording()
+    def stop_transcription_recording(self):
+        """停止录音并处理（转录模式）"""
+        self._stop_recording("transcriptions")
     
     def stop_translation_recording(self):
         """停止录音并处理（翻译模式）"""
-        audio = self.audio_recorder.stop_recording()
-        if audio == "TOO_SHORT":
-            logger.warning("录音时长太短，状态将重置")
-            self.keyboard_manager.reset_state()
-        elif audio:
-            result = self.audio_processor.process_audio(
-                    audio,
-                    mode="translations",
-                    prompt=""
-                )
-            text, error = result if isinstance(result, tuple) else (result, None)
-            self.keyboard_manager.type_text(text,error)
-        else:
-            logger.error("没有录音数据，状态将重置")
-            self.keyboard_manager.reset_state()
+        self._stop_recording("translations")
 
     def reset_state(self):
         """重置状态"""
@@ -17,6 +17,8 @@ class AudioRecorder:
         self.current_device = None
         self.record_start_time = None
         self.min_record_duration = 1.0  # 最小录音时长（秒）
+        # 录音缓冲在多次录音之间复用，避免每次重新分配
+        self._audio_buffer = io.BytesIO()
         self._check_audio_devices()
         # logger.info(f"初始化完成，临时文件目录: {self.temp_dir}")
         logger.info(f"初始化完成")
@@ -136,8 +138,10 @@ class AudioRecorder:
         audio = np.concatenate(audio_data)
         logger.info(f"音频数据长度: {len(audio)} 采样点")
 
-        # 将 numpy 数组转换为字节流
-        audio_buffer = io.BytesIO()
+        # 将 numpy 数组写入复用的字节流，先清空上一次的录音
+        audio_buffer = self._audio_buffer
+        audio_buffer.seek(0)
+        audio_buffer.truncate(0)
         sf.write(audio_buffer, audio, self.sample_rate, format='WAV')
         audio_buffer.seek(0)  # 将缓冲区指针移动到开始位置
         
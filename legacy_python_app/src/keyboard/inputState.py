@@ -14,9 +14,20 @@ class InputState(Enum):
     @property
     def is_recording(self):
         """检查是否处于录音状态"""
-        return self in (InputState.RECORDING, InputState.RECORDING_TRANSLATE)
+        return self in _RECORDING_STATES
     
+    @property
+    def is_processing(self):
+        """检查是否正在处理录音结果"""
+        return self in _PROCESSING_STATES
+
     @property
     def can_start_recording(self):
-        """检查是否可以开始新的录音"""
-        return not self.is_recording
+        """检查是否可以开始新的录音，处理上一段录音期间不能开始"""
+        return self in _IDLE_STATES
+
+
+# 状态集合，模块加载时构建一次
+_RECORDING_STATES = frozenset({InputState.RECORDING, InputState.RECORDING_TRANSLATE})
+_PROCESSING_STATES = frozenset({InputState.PROCESSING, InputState.TRANSLATING})
+_IDLE_STATES = frozenset({InputState.IDLE, InputState.WARNING, InputState.ERROR})
@@ -1,9 +1,26 @@
 from pynput.keyboard import Controller, Key, Listener
-import pyperclip
+from ..utils import clipboard
 from ..utils.logger import logger
 import time
+import threading
+import queue
 from .inputState import InputState
 import os
+import re
+import sys
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 终端相关的进程名，任意一个出现在进程名中即视为终端
+_TERM_RE = re.compile("|".join(map(re.escape, [
+    'terminal', 'bash', 'zsh', 'fish', 'sh', 'ksh', 'csh', 'tcsh',
+    'cmd.exe', 'powershell', 'pwsh', 'windows terminal', 'wt.exe',
+    'alacritty', 'iterm', 'iterm2', 'gnome-terminal', 'konsole',
+    'xterm', 'uxterm', 'rxvt', 'putty', 'mintty', 'conhost.exe'
+])))
 
 
 class KeyboardManager:
@@ -17,9 +34,28 @@ class KeyboardManager:
         self.warning_message = None  # 用于跟踪警告信息
         self.option_press_time = None  # 记录 Option 按下的时间戳
         self.PRESS_DURATION_THRESHOLD = 0.3  # 按键持续时间阈值（秒）
-        self.is_checking_duration = False  # 用于控制定时器线程
+        self.TYPE_BATCH_SIZE = 32  # 逐字符输入时每批的字符数
+        self.PASTE_SETTLE_DELAY = 0.5  # 粘贴后等待目标程序读取剪贴板的时间（秒）
+        self._duration_timer = None  # 按键持续时间定时器
+        self._clear_timer = None  # 警告/错误消息清除定时器
         self.has_triggered = False  # 用于防止重复触发
         self._original_clipboard = None  # 保存原始剪贴板内容
+        self._save_pending = False  # 本次会话是否已安排保存剪贴板
+        self._streamed_text = ""  # 流式输出时已经输入的文本
+        self._pending_delta = ""  # 流式输出时尚未粘贴的文本
+        self._last_paste = 0.0  # 上次粘贴的时间（time.monotonic）
+        self._keep_clipboard = os.getenv("KEEP_ORIGINAL_CLIPBOARD", "true").lower() == "true"  # 输入完成后是否恢复原剪贴板
+
+        # 键盘输出、剪贴板读取和回调都交给工作线程执行，监听回调只负责入队
+        self._action_q = queue.Queue()
+        self._action_handlers = {
+            "ui_update": self._update_status,
+            "callback": lambda callback: callback(),
+            "save_clipboard": lambda _: self._save_clipboard(),
+        }
+        self._ui_seq = 0  # 最新一次状态文本更新的序号
+        self._ui_lock = threading.Lock()
+        threading.Thread(target=self._action_worker, daemon=True).start()
         
         
         # 回调函数
@@ -34,12 +70,12 @@ class KeyboardManager:
         self._state = InputState.IDLE
         self._state_messages = {
             InputState.IDLE: "",
-            InputState.RECORDING: "🎤 正在录音...",
-            InputState.RECORDING_TRANSLATE: "🎤 正在录音 (翻译模式)",
-            InputState.PROCESSING: "🔄 正在转录...",
-            InputState.TRANSLATING: "🔄 正在翻译...",
-            InputState.ERROR: lambda msg: f"{msg}",  # 错误消息使用函数动态生成
-            InputState.WARNING: lambda msg: f"⚠️ {msg}"  # 警告消息使用函数动态生成
+            InputState.RECORDING: sys.intern("🎤 正在录音..."),
+            InputState.RECORDING_TRANSLATE: sys.intern("🎤 正在录音 (翻译模式)"),
+            InputState.PROCESSING: sys.intern("🔄 正在转录..."),
+            InputState.TRANSLATING: sys.intern("🔄 正在翻译..."),
+            InputState.ERROR: "{}",  # 错误消息在状态切换时格式化
+            InputState.WARNING: "⚠️ {}"  # 警告消息在状态切换时格式化
         }
 
         # 获取系统平台
@@ -50,7 +86,11 @@ class KeyboardManager:
         else:
             self.sysetem_platform = Key.cmd
             logger.info("配置到Mac平台")
-        
+
+        # 运行环境在进程生命周期内不会变化，启动时检测一次即可
+        self._is_terminal = self.detect_terminal_environment()
+        logger.info(f"检测到环境类型: {'终端' if self._is_terminal else 'GUI'}")
+
 
         # 获取转录和翻译按钮
         transcriptions_button = os.getenv("TRANSCRIPTIONS_BUTTON")
@@ -87,54 +127,84 @@ class KeyboardManager:
             # 根据状态转换类型显示不同消息
             if new_state == InputState.RECORDING:
                 # 录音状态
-                self.temp_text_length = 0
-                self.type_temp_text(message)
-                self.on_record_start()                   
+                self._queue_status(message, delete_previous=False)
+                self._action_q.put(("callback", self.on_record_start))
             elif new_state == InputState.RECORDING_TRANSLATE:
                 # 翻译,录音状态
-                self.temp_text_length = 0
-                self.type_temp_text(message)
-                self.on_translate_start()
+                self._queue_status(message, delete_previous=False)
+                self._action_q.put(("callback", self.on_translate_start))
             elif new_state == InputState.PROCESSING:
-                self._delete_previous_text()
-                self.type_temp_text(message)
+                self._queue_status(message)
                 self.processing_text = message
-                self.on_record_stop()
+                self._action_q.put(("callback", self.on_record_stop))
             elif new_state == InputState.TRANSLATING:
                 # 翻译状态
-                self._delete_previous_text()                 
-                self.type_temp_text(message)
+                self._queue_status(message)
                 self.processing_text = message
-                self.on_translate_stop()
+                self._action_q.put(("callback", self.on_translate_stop))
             elif new_state == InputState.WARNING:
                 # 警告状态
-                message = message(self.warning_message)
-                self._delete_previous_text()
-                self.type_temp_text(message)
+                message = message.format(self.warning_message)
+                self._queue_status(message)
                 self.warning_message = None
-                self._schedule_message_clear()     
+                self._schedule_message_clear()
             elif new_state == InputState.ERROR:
                 # 错误状态
-                message = message(self.error_message)
-                self._delete_previous_text()
-                self.type_temp_text(message)
+                message = message.format(self.error_message)
+                self._queue_status(message)
                 self.error_message = None
-                self._schedule_message_clear()  
+                self._schedule_message_clear()
             elif new_state == InputState.IDLE:
                 # 空闲状态，清除所有临时文本
                 self.processing_text = None
             else:
                 # 其他状态
-                self.type_temp_text(message)
+                self._queue_status(message, delete_previous=False)
+
+    def _queue_status(self, message, delete_previous=True):
+        """排队更新临时状态文本
+
+        Args:
+            message: 要显示的状态文本
+            delete_previous: 是否先删除当前的临时文本，否则保留它只是不再跟踪
+        """
+        with self._ui_lock:
+            self._ui_seq += 1
+            self._action_q.put(("ui_update", (self._ui_seq, message, delete_previous)))
+
+    def _update_status(self, update):
+        """执行状态文本更新，队列中已有更新的状态时不再输入这条即将被替换的文本"""
+        seq, message, delete_previous = update
+        if delete_previous:
+            self._delete_previous_text()
+        else:
+            self._forget_previous_text()
+        if seq == self._ui_seq:
+            self.type_temp_text(message)
+
+    def _action_worker(self):
+        """依次执行队列中的动作，保证键盘输出的顺序"""
+        while True:
+            action, arg = self._action_q.get()
+            try:
+                self._action_handlers[action](arg)
+            except Exception as e:
+                logger.error(f"执行动作失败 ({action}): {e}", exc_info=True)
     
     def _schedule_message_clear(self):
-        """计划清除消息"""
-        def clear_message():
-            time.sleep(2)  # 警告消息显示2秒
+        """计划清除消息，新消息到来时重新计时"""
+        if self._clear_timer is not None:
+            self._clear_timer.cancel()
+        # 警告消息显示2秒
+        self._clear_timer = threading.Timer(2, self._clear_message)
+        self._clear_timer.daemon = True
+        self._clear_timer.start()
+
+    def _clear_message(self):
+        """消息显示时间到，仍在显示消息时回到空闲状态"""
+        self._clear_timer = None
+        if self.state in (InputState.WARNING, InputState.ERROR):
             self.state = InputState.IDLE
-        
-        import threading
-        threading.Thread(target=clear_message, daemon=True).start()
     
     def show_warning(self, warning_message):
         """显示警告消息"""
@@ -149,42 +219,53 @@ class KeyboardManager:
     def _save_clipboard(self):
         """保存当前剪贴板内容"""
         if self._original_clipboard is None:
-            self._original_clipboard = pyperclip.paste()
+            self._original_clipboard = clipboard.paste()
 
     def _restore_clipboard(self):
         """恢复原始剪贴板内容"""
         if self._original_clipboard is not None:
-            pyperclip.copy(self._original_clipboard)
+            clipboard.copy(self._original_clipboard)
             self._original_clipboard = None
+        self._save_pending = False
+
+    def _type_characters(self, text):
+        """分批逐字符输入文本，换行和制表符由 Controller.type 转换为对应按键"""
+        for i in range(0, len(text), self.TYPE_BATCH_SIZE):
+            self.keyboard.type(text[i:i + self.TYPE_BATCH_SIZE])
+            # 每批之间短暂延迟确保输入稳定
+            time.sleep(0.01)
 
     def type_text_character_by_character_final(self, text):
         """逐字符输入最终文本（不含完成标记）"""
         try:
-            for char in text:
-                if char == ' ':
-                    self.keyboard.press(Key.space)
-                    self.keyboard.release(Key.space)
-                elif char == '\n':
-                    self.keyboard.press(Key.enter)
-                    self.keyboard.release(Key.enter)
-                elif char == '\t':
-                    self.keyboard.press(Key.tab)
-                    self.keyboard.release(Key.tab)
-                else:
-                    # 普通字符直接输入
-                    self.keyboard.press(char)
-                    self.keyboard.release(char)
-
-                # 短暂延迟确保输入稳定
-                time.sleep(0.01)
+            self._type_characters(text)
 
         except Exception as e:
             logger.error(f"最终文本逐字符输入失败: {e}")
             # 降级到剪贴板方式
-            pyperclip.copy(text)
-            with self.keyboard.pressed(self.sysetem_platform):
-                self.keyboard.press('v')
-                self.keyboard.release('v')
+            self._paste(text)
+
+    def type_delta(self, delta):
+        """输入流式返回的一段文本
+
+        在处理回调执行期间由 LLM 流式响应调用，此时工作线程正阻塞等待处理结果，
+        因此直接输入而不是放入队列。
+        """
+        if not delta:
+            return
+        if not self._streamed_text and not self._pending_delta:
+            # 收到第一段内容时清除“正在翻译”等临时状态
+            self._delete_previous_text()
+        if self._is_terminal:
+            self._streamed_text += delta
+            self._type_characters(delta)
+            return
+        # 距上次粘贴不足稳定时间时先攒着，由后续的片段或 type_text 一并粘贴
+        self._pending_delta += delta
+        if time.monotonic() - self._last_paste >= self.PASTE_SETTLE_DELAY:
+            text, self._pending_delta = self._pending_delta, ""
+            self._paste(text)
+            self._streamed_text += text
 
     def type_text(self, text, error_message=None):
         """将文字输入到当前光标位置（智能选择输入方式）
@@ -197,44 +278,59 @@ class KeyboardManager:
         if isinstance(text, tuple):
             text, error_message = text
 
+        # 流式输出时已经输入的部分不再重复输入，尚未粘贴的部分包含在最终文本中
+        streamed, self._streamed_text = self._streamed_text, ""
+        self._pending_delta = ""
+        if streamed and (error_message or not text or not text.startswith(streamed)):
+            # 流式输出中途失败或最终结果与已输入的不一致，删除已输入的部分
+            self.temp_text_length = len(streamed)
+            self._delete_previous_text()
+            streamed = ""
+
+        if error_message or not text:
+            # 不再输入结果，流式粘贴可能已经改写了剪贴板，在这里恢复并结束本次会话的保存
+            try:
+                self._restore_clipboard()
+            except Exception as e:
+                logger.error(f"恢复剪贴板失败: {e}")
+
+        # 只在仍处于处理状态时切换状态，不覆盖处理期间发生的更新的状态
         if error_message:
-            self.show_error(error_message)
+            if self.state.is_processing:
+                self.show_error(error_message)
             return
 
         if not text:
             # 如果没有文本且不是错误，可能是录音时长不足
-            if self.state in (InputState.PROCESSING, InputState.TRANSLATING):
+            if self.state.is_processing:
                 self.show_warning("录音时长过短，请至少录制1秒")
             return
 
         try:
             logger.info("正在输入转录文本...")
             self._delete_previous_text()
+            remaining = text[len(streamed):]
 
-            # 检查是否在终端环境
-            is_terminal = self.detect_terminal_environment()
-            logger.info(f"检测到环境类型: {'终端' if is_terminal else 'GUI'}")
-
-            if is_terminal:
+            if self._is_terminal:
                 # 终端环境：直接逐字符输入最终文本，不显示临时状态
                 logger.info("终端环境，使用逐字符输入")
-                self.type_text_character_by_character_final(text)
+                self.type_text_character_by_character_final(remaining)
             else:
                 # GUI环境：使用原有的临时状态+完成标记方式
                 logger.info("GUI环境，使用剪贴板粘贴方式")
                 # 先输入文本和完成标记
-                self.type_temp_text_clipboard(text + " ✅")
+                self.type_temp_text_clipboard(remaining + " ✅")
 
                 # 等待一小段时间确保文本已输入
-                time.sleep(0.5)
+                time.sleep(self.PASTE_SETTLE_DELAY)
 
                 # 删除完成标记（2个字符：空格和✅）
                 self.temp_text_length = 2
                 self._delete_previous_text()
 
             # 处理剪贴板
-            if os.getenv("KEEP_ORIGINAL_CLIPBOARD", "true").lower() != "true":
-                pyperclip.copy(text)
+            if not self._keep_clipboard:
+                clipboard.copy(text)
             else:
                 # 恢复原始剪贴板内容
                 self._restore_clipboard()
@@ -242,19 +338,30 @@ class KeyboardManager:
             logger.info("文本输入完成")
 
             # 清理处理状态
-            self.state = InputState.IDLE
+            if self.state.is_processing:
+                self.state = InputState.IDLE
         except Exception as e:
             logger.error(f"文本输入失败: {e}")
-            self.show_error(f"❌ 文本输入失败: {e}")
+            if self.state.is_processing:
+                self.show_error(f"❌ 文本输入失败: {e}")
     
     def _delete_previous_text(self):
-        """删除之前输入的临时文本"""
-        if self.temp_text_length > 0:
-            for _ in range(self.temp_text_length):
-                self.keyboard.press(Key.backspace)
-                self.keyboard.release(Key.backspace)
+        """删除之前输入的临时文本
+
+        临时文本之前可能是用户自己的内容，不能用 Shift+Home 选中整行删除，
+        只能按临时文本的长度逐个退格。
+        """
+        press, release = self.keyboard.press, self.keyboard.release
+        backspace = Key.backspace
+        for _ in range(self.temp_text_length):
+            press(backspace)
+            release(backspace)
 
         self.temp_text_length = 0
+
+    def _forget_previous_text(self):
+        """保留已输入的临时文本，只是不再跟踪它"""
+        self.temp_text_length = 0
     
     def type_text_character_by_character(self, text):
         """逐个字符输入文本，兼容终端环境
@@ -270,24 +377,7 @@ class KeyboardManager:
             self._delete_previous_text()
 
             # 逐个字符输入
-            for char in text:
-                # 处理特殊字符
-                if char == ' ':
-                    self.keyboard.press(Key.space)
-                    self.keyboard.release(Key.space)
-                elif char == '\n':
-                    self.keyboard.press(Key.enter)
-                    self.keyboard.release(Key.enter)
-                elif char == '\t':
-                    self.keyboard.press(Key.tab)
-                    self.keyboard.release(Key.tab)
-                else:
-                    # 普通字符直接输入
-                    self.keyboard.press(char)
-                    self.keyboard.release(char)
-
-                # 短暂延迟确保输入稳定
-                time.sleep(0.01)
+            self._type_characters(text)
 
             # 更新临时文本长度
             self.temp_text_length = len(text)
@@ -302,17 +392,32 @@ class KeyboardManager:
         if not text:
             return
 
-        # 将文本复制到剪贴板
-        pyperclip.copy(text)
-
-        # 模拟 Ctrl + V 粘贴文本
-        with self.keyboard.pressed(self.sysetem_platform):
-            self.keyboard.press('v')
-            self.keyboard.release('v')
+        self._paste(text)
 
         # 更新临时文本长度
         self.temp_text_length = len(text)
 
+    def _paste(self, text):
+        """通过剪贴板粘贴输入文本"""
+        # 目标程序处理粘贴时才读取剪贴板，距上次粘贴太近时先等待，以免覆盖尚未读取的内容
+        wait = self._last_paste + self.PASTE_SETTLE_DELAY - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        # 将文本复制到剪贴板
+        clipboard.copy(text)
+
+        # 模拟 Ctrl + V 粘贴文本，出错时也要松开修饰键
+        press, release = self.keyboard.press, self.keyboard.release
+        modifier = self.sysetem_platform
+        press(modifier)
+        try:
+            press('v')
+            release('v')
+        finally:
+            release(modifier)
+            self._last_paste = time.monotonic()
+
     def detect_terminal_environment(self):
         """检测是否在终端环境中
 
@@ -321,7 +426,6 @@ class KeyboardManager:
         """
         try:
             # 方法1: 检查环境变量
-            import os
             terminal_indicators = [
                 'TERM', 'SHELL', 'PS1', 'PROMPT', 'SSH_TTY',
                 'WT_SESSION',  # Windows Terminal
@@ -335,44 +439,31 @@ class KeyboardManager:
                     return True
 
             # 方法2: 检查进程树（需要psutil）
-            try:
-                import psutil
-                current_process = psutil.Process()
-
-                # 检查当前进程及其父进程
-                processes_to_check = [current_process]
-                if current_process.parent():
-                    processes_to_check.append(current_process.parent())
-
-                terminal_processes = [
-                    'terminal', 'bash', 'zsh', 'fish', 'sh', 'ksh', 'csh', 'tcsh',
-                    'cmd.exe', 'powershell', 'pwsh', 'windows terminal', 'wt.exe',
-                    'alacritty', 'iterm', 'iterm2', 'gnome-terminal', 'konsole',
-                    'xterm', 'uxterm', 'rxvt', 'putty', 'mintty', 'conhost.exe'
-                ]
-
-                for process in processes_to_check:
-                    if process and process.name():
-                        process_name = process.name().lower()
-                        for term in terminal_processes:
-                            if term in process_name:
+            if psutil is None:
+                logger.debug("psutil未安装，跳过进程检测")
+            else:
+                try:
+                    current_process = psutil.Process()
+
+                    # 检查当前进程及其父进程
+                    processes_to_check = [current_process]
+                    if current_process.parent():
+                        processes_to_check.append(current_process.parent())
+
+                    for process in processes_to_check:
+                        if process and process.name():
+                            if _TERM_RE.search(process.name().lower()):
                                 logger.debug(f"检测到终端进程: {process.name()}")
                                 return True
 
-            except ImportError:
-                logger.debug("psutil未安装，跳过进程检测")
-            except Exception as e:
-                logger.debug(f"进程检测失败: {e}")
+                except Exception as e:
+                    logger.debug(f"进程检测失败: {e}")
 
-            # 方法3: 检查终端相关的程序
+            # 方法3: 检查标准输出是否连接到终端
             try:
-                import subprocess
-                # macOS/Linux: 检查TTY
-                if os.name == 'posix':
-                    result = subprocess.run(['tty'], capture_output=True, text=True)
-                    if result.returncode == 0 and 'not a tty' not in result.stdout:
-                        logger.debug(f"检测到TTY: {result.stdout.strip()}")
-                        return True
+                if sys.stdout is not None and os.isatty(sys.stdout.fileno()):
+                    logger.debug("检测到TTY")
+                    return True
 
             except Exception as e:
                 logger.debug(f"TTY检测失败: {e}")
@@ -389,8 +480,8 @@ class KeyboardManager:
         if not text:
             return
 
-        # 检查是否在终端环境，优先使用逐字符输入
-        if self.detect_terminal_environment():
+        # 终端环境优先使用逐字符输入
+        if self._is_terminal:
             logger.debug("检测到终端环境，使用逐字符输入")
             self.type_text_character_by_character(text)
         else:
@@ -398,46 +489,44 @@ class KeyboardManager:
             self.type_temp_text_clipboard(text)
     
     def start_duration_check(self):
-        """开始检查按键持续时间"""
-        if self.is_checking_duration:
+        """开始计时，按键持续时间达到阈值时触发一次检查"""
+        self.cancel_duration_check()
+        self._duration_timer = threading.Timer(self.PRESS_DURATION_THRESHOLD, self._on_duration_reached)
+        self._duration_timer.daemon = True
+        self._duration_timer.start()
+
+    def cancel_duration_check(self):
+        """取消尚未触发的按键计时"""
+        if self._duration_timer is not None:
+            self._duration_timer.cancel()
+            self._duration_timer = None
+
+    def _on_duration_reached(self):
+        """按键持续时间达到阈值时触发相应功能"""
+        if self.has_triggered or not self.option_pressed:
             return
 
-        def check_duration():
-            while self.is_checking_duration and self.option_pressed:
-                #print(f"Option pressed: {self.option_pressed}, Time: {time.time() - self.option_press_time}")
-
-                current_time = time.time()
-                if (not self.has_triggered and 
-                    self.option_press_time and 
-                    (current_time - self.option_press_time) >= self.PRESS_DURATION_THRESHOLD):
-                    
-                    # 达到阈值时触发相应功能
-                    if self.option_pressed and self.shift_pressed and self.state.can_start_recording:
-                        self.state = InputState.RECORDING_TRANSLATE
-                        # self.on_translate_start()
-                        self.has_triggered = True
-                    elif self.option_pressed and not self.shift_pressed and self.state.can_start_recording:
-                        self.state = InputState.RECORDING
-                        # self.on_record_start()
-                        self.has_triggered = True
-                
-                time.sleep(0.01)  # 短暂休眠以降低 CPU 使用率
-
-        self.is_checking_duration = True
-        import threading
-        threading.Thread(target=check_duration, daemon=True).start()
+        if self.shift_pressed and self.state.can_start_recording:
+            self.state = InputState.RECORDING_TRANSLATE
+            self.has_triggered = True
+        elif not self.shift_pressed and self.state.can_start_recording:
+            self.state = InputState.RECORDING
+            self.has_triggered = True
 
     def on_press(self, key):
         """按键按下时的回调"""
         try:
             if key == self.transcriptions_button: #Key.f8:  # Option 键按下
-                # 在开始任何操作前保存剪贴板内容
-                if self._original_clipboard is None:
-                    self._original_clipboard = pyperclip.paste()
-                    
-                self.option_pressed = True
-                self.option_press_time = time.time()
-                self.start_duration_check()
+                # 在开始任何操作前保存剪贴板内容，按住时的重复按下事件不再重复读取
+                if not self._save_pending:
+                    self._save_pending = True
+                    self._action_q.put(("save_clipboard", None))
+                
+                # 按住不放时系统会重复发送按下事件，只在首次按下时开始计时
+                if not self.option_pressed:
+                    self.option_pressed = True
+                    self.option_press_time = time.time()
+                    self.start_duration_check()
             elif key == self.translations_button:
                 self.shift_pressed = True
         except AttributeError:
@@ -450,7 +539,7 @@ class KeyboardManager:
                 self.shift_pressed = False
                 self.option_pressed = False
                 self.option_press_time = None
-                self.is_checking_duration = False
+                self.cancel_duration_check()
                 
                 if self.has_triggered:
                     if self.state == InputState.RECORDING_TRANSLATE:
@@ -485,11 +574,13 @@ class KeyboardManager:
         self.option_pressed = False
         self.shift_pressed = False
         self.option_press_time = None
-        self.is_checking_duration = False
+        self.cancel_duration_check()
         self.has_triggered = False
         self.processing_text = None
         self.error_message = None
         self.warning_message = None
+        self._streamed_text = ""
+        self._pending_delta = ""
         
         # 设置为空闲状态
         self.state = InputState.IDLE
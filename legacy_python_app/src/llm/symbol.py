@@ -1,36 +1,59 @@
-from openai import OpenAI
-import dotenv
+from openai import AsyncOpenAI
 import os
+from ..utils.concurrency import run_sync
+from ..utils.env import ensure_env_loaded
 from ..utils.logger import logger
 
-dotenv.load_dotenv()
 
 class SymbolProcessor:
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("GROQ_API_KEY"), base_url=os.getenv("GROQ_BASE_URL"))
+        ensure_env_loaded()
+        self.client = AsyncOpenAI(api_key=os.getenv("GROQ_API_KEY"), base_url=os.getenv("GROQ_BASE_URL"))
         self.model = os.getenv("GROQ_ADD_SYMBOL_MODEL", "llama3-8b-8192")
 
-    def add_symbol(self, text):
+    async def _collect_stream(self, response, on_delta):
+        """读取流式响应，每收到一段内容就调用 on_delta，返回完整文本"""
+        parts = []
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                if on_delta is not None:
+                    on_delta(delta)
+        return "".join(parts)
+
+    def add_symbol(self, text, on_delta=None):
         """为输入的文本添加合适的标点符号"""
+        return run_sync(self.aadd_symbol(text, on_delta))
+
+    async def aadd_symbol(self, text, on_delta=None):
+        """为输入的文本添加合适的标点符号（异步）"""
 
         system_prompt = """
         Please add appropriate punctuation to the user’s input and return it. Apart from this, do not add or modify anything else. Do not translate the user's input. Do not add any explanation. Do not answer the user's question and so on. Just output the user's input with punctuation!
         """
         try:
-            logger.info(f"正在添加标点符号...")
-            response = self.client.chat.completions.create(
+            logger.info("正在添加标点符号...")
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": text}
-            ]
+            ],
+                stream=True
         )
-            return response.choices[0].message.content
+            return await self._collect_stream(response, on_delta)
         except Exception as e:
             return text, e
         
-    def optimize_result(self, text):
+    def optimize_result(self, text, on_delta=None):
         """优化识别结果"""
+        return run_sync(self.aoptimize_result(text, on_delta))
+
+    async def aoptimize_result(self, text, on_delta=None):
+        """优化识别结果（异步）"""
         # system_prompt = """
         # You are a content input optimizer.
 
@@ -56,14 +79,15 @@ class SymbolProcessor:
         Do not add answer to the user's question,just output the optimized content.
         """
         try:
-            logger.info(f"正在优化识别结果...")
-            response = self.client.chat.completions.create(
+            logger.info("正在优化识别结果...")
+            response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": text}
-            ]
+            ],
+                stream=True
         )
-            return response.choices[0].message.content
+            return await self._collect_stream(response, on_delta)
         except Exception as e:
             return text, e
\ No newline at end of file
@@ -1,78 +1,141 @@
+import json
 import os
-import requests
-from dotenv import load_dotenv
+import httpx
+from ..utils.cache import LRUCache
+from ..utils.concurrency import run_sync
+from ..utils.env import ensure_env_loaded
 from ..utils.logger import logger
-load_dotenv()
+
+
+SYSTEM_PROMPT = """
+        You are a translation assistant.
+        Please translate the user's input into English.
+        """
+
+
+def _body_template(model):
+    """预先序列化请求体中固定不变的部分
+
+    Returns:
+        tuple: (前缀, 后缀)，中间拼接 JSON 编码后的用户文本即为完整请求体
+    """
+    payload = {
+        "model": model,
+        "messages": [
+            {
+                "role": "system",
+                "content": SYSTEM_PROMPT
+            },
+            {
+                "role": "user",
+                "content": None
+            }
+        ],
+        "stream": True
+    }
+    # 用户文本是最后一个 null，之后只剩固定的结尾
+    head, _, tail = json.dumps(payload, ensure_ascii=False).rpartition("null")
+    return head, tail
+
+
+def _emit(parts, delta, on_delta):
+    """记录一段流式返回的内容并通知调用方"""
+    if not delta:
+        return
+    parts.append(delta)
+    if on_delta is not None:
+        on_delta(delta)
+
 
 class TranslateProcessor:
+    DEFAULT_TIMEOUT = 30  # API 超时时间（秒）
+
     def __init__(self):
+        ensure_env_loaded()
         self.url = "https://api.siliconflow.cn/v1/chat/completions"
         self.headers = {
             'Authorization': f"Bearer {os.getenv('SILICONFLOW_API_KEY')}",
             "Content-Type": "application/json"
         }
         self.model = os.getenv("SILICONFLOW_TRANSLATE_MODEL", "THUDM/glm-4-9b-chat")
+        self._body_head, self._body_tail = _body_template(self.model)
+        self._cache = LRUCache()  # 相同文本直接返回上次的译文
+        # 复用同一个客户端，保持连接避免每次翻译都重新握手
+        self.client = httpx.AsyncClient(headers=self.headers, timeout=self.DEFAULT_TIMEOUT)
 
-    def translate(self, text):
-        system_prompt = """
-        You are a translation assistant.
-        Please translate the user's input into English.
-        """
+    def translate(self, text, on_delta=None):
+        return run_sync(self.atranslate(text, on_delta))
 
-        payload = {
-            "model": self.model,
-            "messages":[
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": text
-                }
-            ]
-        }
+    async def atranslate(self, text, on_delta=None):
+        """流式翻译，每收到一段译文就调用 on_delta，返回完整译文"""
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+        body = self._body_head + json.dumps(text, ensure_ascii=False) + self._body_tail
         try:
-            response = requests.request("POST", self.url, headers=self.headers, json=payload)
-            return response.json().get('choices', [{}])[0].get('message', {}).get('content', '')
+            parts = []
+            async with self.client.stream("POST", self.url, content=body.encode()) as response:
+                response.raise_for_status()
+                # 以 SSE 格式返回，每帧形如 "data: {...}"，以 "data: [DONE]" 结束
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get('choices') or [{}]
+                    _emit(parts, choices[0].get('delta', {}).get('content'), on_delta)
+            result = "".join(parts)
+            # 没有返回任何内容时不缓存，下次重新请求
+            if result:
+                self._cache.put(text, result)
+            return result
         except Exception as e:
             return text, e
 
 class LocalTranslateProcessor:
+    DEFAULT_TIMEOUT = 30  # API 超时时间（秒）
+
     def __init__(self):
+        ensure_env_loaded()
         self.url = "http://192.168.8.107:11434/api/chat"  # Ollama 默认端口是 11434
         self.headers = {
             "Content-Type": "application/json"
         }
         self.model = "gpt-oss:latest"
+        self._body_head, self._body_tail = _body_template(self.model)
+        self._cache = LRUCache()  # 相同文本直接返回上次的译文
+        self.client = httpx.AsyncClient(headers=self.headers, timeout=self.DEFAULT_TIMEOUT)
 
-    def translate(self, text):
-        logger.info(f"调用本地LLM: {self.model}")
-        system_prompt = """
-        You are a translation assistant.
-        Please translate the user's input into English.
-        """
+    def translate(self, text, on_delta=None):
+        return run_sync(self.atranslate(text, on_delta))
 
-        payload = {
-            "model": self.model,
-            "messages": [
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user",
-                    "content": text
-                }
-            ],
-            "stream": False
-        }
+    async def atranslate(self, text, on_delta=None):
+        """流式翻译，每收到一段译文就调用 on_delta，返回完整译文"""
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+        logger.info("调用本地LLM: %s", self.model)
+        body = self._body_head + json.dumps(text, ensure_ascii=False) + self._body_tail
 
         try:
-            response = requests.post(self.url, headers=self.headers, json=payload)
-            response.raise_for_status()  # 这会在HTTP错误时抛出异常
-            return response.json().get('message', {}).get('content', '')
-        except requests.RequestException as e:
+            parts = []
+            async with self.client.stream("POST", self.url, content=body.encode()) as response:
+                response.raise_for_status()  # 这会在HTTP错误时抛出异常
+                # Ollama 每行返回一个 JSON 对象，最后一行的 done 为 true
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    _emit(parts, chunk.get('message', {}).get('content'), on_delta)
+                    if chunk.get('done'):
+                        break
+            result = "".join(parts)
+            # 没有返回任何内容时不缓存，下次重新请求
+            if result:
+                self._cache.put(text, result)
+            return result
+        except httpx.HTTPError as e:
             return f"Translation error: {str(e)}"
         except Exception as e:
             return f"Unexpected error: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,118 @@
+import asyncio
+import functools
+import hashlib
+import time
+
+from ..llm.translate import LocalTranslateProcessor, TranslateProcessor
+from ..utils.cache import LRUCache
+from ..utils.concurrency import run_sync
+from ..utils.logger import logger
+
+# 接口没有返回识别文本时使用的占位文本
+FAILED_TEXT = '获取失败'
+
+
+def _audio_digest(audio_buffer):
+    """计算音频内容的摘要，作为识别结果缓存的键"""
+    with audio_buffer.getbuffer() as view:
+        return hashlib.blake2b(view, digest_size=16).digest()
+
+
+class BaseASRProcessor:
+    """语音识别处理器基类，子类只需实现 _call_api，按需覆盖 _extract_text 和 _postprocess"""
+
+    # 类级别的配置参数
+    DEFAULT_TIMEOUT = 20  # API 超时时间（秒）
+    CALL_TIMEOUT = 10  # 单次请求超时时间（秒）
+    CONNECT_TIMEOUT = 3  # 建立连接超时时间（秒）
+    SERVICE_NAME = "ASR"  # 日志中显示的服务名称
+    TRANSLATE_RESULT = True  # 翻译模式下是否把识别结果交给 LLM 翻译
+
+    _client = None  # httpx.AsyncClient，由子类创建
+
+    def __init__(self):
+        self.timeout_seconds = self.DEFAULT_TIMEOUT
+        self._cache = LRUCache()  # 相同音频直接返回上次的识别结果
+
+    @functools.cached_property
+    def translate_processor(self):
+        """翻译处理器，首次翻译时才创建"""
+        return LocalTranslateProcessor()
+        #return TranslateProcessor()
+
+    def close(self):
+        """关闭 HTTP 客户端"""
+        if self._client is not None:
+            run_sync(self._client.aclose())
+
+    async def _call_api(self, audio_buffer, mode, prompt):
+        """调用识别接口，返回接口的原始结果"""
+        raise NotImplementedError
+
+    def _extract_text(self, result):
+        """从接口的原始结果中取出识别文本"""
+        return result
+
+    async def _postprocess(self, text, on_delta=None):
+        """对最终结果做额外处理，默认原样返回"""
+        return text
+
+    def process_audio(self, audio_buffer, mode="transcriptions", prompt="", on_delta=None):
+        """处理音频（转录或翻译）
+
+        Args:
+            audio_buffer: 音频数据缓冲，由调用方负责复用或关闭
+            mode: 'transcriptions' 或 'translations'，决定是转录还是翻译
+            prompt: 提示词
+            on_delta: 结果流式返回时，每收到一段文本调用一次
+
+        Returns:
+            tuple: (结果文本, 错误信息)
+            - 如果成功，错误信息为 None
+            - 如果失败，结果文本为 None
+        """
+        return run_sync(self.aprocess_audio(audio_buffer, mode, prompt, on_delta))
+
+    async def aprocess_audio(self, audio_buffer, mode="transcriptions", prompt="", on_delta=None):
+        """处理音频（转录或翻译）（异步）"""
+        try:
+            start_time = time.time()
+
+            key = (_audio_digest(audio_buffer), mode, prompt)
+            text = self._cache.get(key)
+            if text is None:
+                logger.info("正在调用 %s API... (模式: %s)", self.SERVICE_NAME, mode)
+                # 直接把字节流交给客户端分块读取，上传前回到开头
+                audio_buffer.seek(0)
+                text = self._extract_text(await self._call_api(audio_buffer, mode, prompt))
+                # 只缓存真正的识别结果，失败时重发同一段音频会重新识别
+                if text and text != FAILED_TEXT:
+                    self._cache.put(key, text)
+            else:
+                logger.info("相同音频，使用缓存的识别结果")
+
+            # 先发出翻译请求，等待响应期间再记录日志
+            translate_task = None
+            if mode == "translations" and self.TRANSLATE_RESULT:
+                translate_task = asyncio.create_task(self.translate_processor.atranslate(text, on_delta))
+                await asyncio.sleep(0)
+
+            logger.info("API 调用成功 (%s), 耗时: %.1f秒", mode, time.time() - start_time)
+
+            if translate_task is not None:
+                text = await translate_task
+                logger.info("翻译结果: %s", text)
+            else:
+                logger.info("识别结果: %s", text)
+                text = await self._postprocess(text, on_delta)
+
+            return text, None
+
+        except TimeoutError:
+            error_msg = f"❌ API 请求超时 ({self.timeout_seconds}秒)"
+            logger.error(error_msg)
+            return None, error_msg
+        except Exception as e:
+            error_msg = f"❌ {str(e)}"
+            logger.error("音频处理错误: %s", e, exc_info=True)
+            return None, error_msg
@@ -1,69 +1,54 @@
+import functools
 import os
-import threading
-import time
-from functools import wraps
+import re
 
-import dotenv
 import httpx
-#from openai import OpenAI
+from openai import APITimeoutError, OpenAI
 from opencc import OpenCC
 
 #from ..llm.symbol import SymbolProcessor
+from ._base import BaseASRProcessor
+from ..utils.concurrency import to_thread
+from ..utils.env import ensure_env_loaded
 from ..utils.logger import logger
 
-dotenv.load_dotenv()
+ensure_env_loaded()
 
-def timeout_decorator(seconds):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            result = [None]
-            error = [None]
-            completed = threading.Event()
+# 汉字（含扩展 A 区和兼容汉字），不含汉字的文本无需繁简转换
+_CJK_RE = re.compile('[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]')
 
-            def target():
-                try:
-                    result[0] = func(*args, **kwargs)
-                except Exception as e:
-                    error[0] = e
-                finally:
-                    completed.set()
 
-            thread = threading.Thread(target=target)
-            thread.daemon = True
-            thread.start()
+@functools.lru_cache(maxsize=1)
+def _get_t2s():
+    """繁转简转换器，加载词典开销较大，所有实例共用一个"""
+    return OpenCC('t2s')
 
-            if completed.wait(seconds):
-                if error[0] is not None:
-                    raise error[0]
-                return result[0]
-            raise TimeoutError(f"操作超时 ({seconds}秒)")
 
-        return wrapper
-    return decorator
-
-class WhisperProcessor:
+class WhisperProcessor(BaseASRProcessor):
     # 类级别的配置参数
-    DEFAULT_TIMEOUT = 20  # API 超时时间（秒）
+    SERVICE_NAME = "Whisper"
+    TRANSLATE_RESULT = False  # 翻译模式直接调用 Whisper 的翻译接口
     DEFAULT_MODEL = None
     
     def __init__(self):
+        super().__init__()
         api_key = os.getenv("GROQ_API_KEY")
         base_url = os.getenv("GROQ_BASE_URL")
         self.convert_to_simplified = os.getenv("CONVERT_TO_SIMPLIFIED", "false").lower() == "true"
-        self.cc = OpenCC('t2s') if self.convert_to_simplified else None
+        self.cc = _get_t2s() if self.convert_to_simplified else None
         #self.symbol = SymbolProcessor()
         self.add_symbol = os.getenv("ADD_SYMBOL", "false").lower() == "true"
         self.optimize_result = os.getenv("OPTIMIZE_RESULT", "false").lower() == "true"
-        self.timeout_seconds = self.DEFAULT_TIMEOUT
         self.service_platform = os.getenv("SERVICE_PLATFORM", "groq").lower()
 
         if self.service_platform == "groq":
             raise ValueError(f"未知的平台: {self.service_platform}")
             assert api_key, "未设置 GROQ_API_KEY 环境变量"
+            # 超时后不重试，请求最多占用 CALL_TIMEOUT 秒
             self.client = OpenAI(
                 api_key=api_key,
-                base_url=base_url if base_url else None
+                base_url=base_url if base_url else None,
+                max_retries=0
             )
             self.DEFAULT_MODEL = "whisper-large-v3-turbo"
         elif self.service_platform == "siliconflow":
@@ -74,70 +59,49 @@ class WhisperProcessor:
 
     def _convert_traditional_to_simplified(self, text):
         """将繁体中文转换为简体中文"""
-        if not self.convert_to_simplified or not text:
+        if not self.convert_to_simplified or not text or not _CJK_RE.search(text):
             return text
         return self.cc.convert(text)
     
-    @timeout_decorator(10)
-    def _call_whisper_api(self, mode, audio_data, prompt):
+    def _call_whisper_api(self, audio_data, mode, prompt):
         """调用 Whisper API"""
-        if mode == "translations":
-            response = self.client.audio.translations.create(
-                model="whisper-large-v3",
-                response_format="text",
-                prompt=prompt,
-                file=("audio.wav", audio_data)
-            )
-        else:  # transcriptions
-            response = self.client.audio.transcriptions.create(
-                model="whisper-large-v3-turbo",
-                response_format="text",
-                prompt=prompt,
-                file=("audio.wav", audio_data)
-            )
-        return str(response).strip()
-
-    def process_audio(self, audio_buffer, mode="transcriptions", prompt=""):
-        """调用 Whisper API 处理音频（转录或翻译）
-        
-        Args:
-            audio_path: 音频文件路径
-            mode: 'transcriptions' 或 'translations'，决定是转录还是翻译
-            prompt: 提示词
-        
-        Returns:
-            tuple: (结果文本, 错误信息)
-            - 如果成功，错误信息为 None
-            - 如果失败，结果文本为 None
-        """
         try:
-            start_time = time.time()
-
-            logger.info(f"正在调用 Whisper API... (模式: {mode})")
-            result = self._call_whisper_api(mode, audio_buffer, prompt)
-
-            logger.info(f"API 调用成功 ({mode}), 耗时: {time.time() - start_time:.1f}秒")
-            result = self._convert_traditional_to_simplified(result)
-            logger.info(f"识别结果: {result}")
-            
-            # 仅在 groq API 时添加标点符号
-            if self.service_platform == "groq" and self.add_symbol:
-                result = self.symbol.add_symbol(result)
-                logger.info(f"添加标点符号: {result}")
-            if self.optimize_result:
-                result = self.symbol.optimize_result(result)
-                logger.info(f"优化结果: {result}")
-
-            return result, None
-            
+            if mode == "translations":
+                response = self.client.audio.translations.create(
+                    model="whisper-large-v3",
+                    response_format="text",
+                    prompt=prompt,
+                    file=("audio.wav", audio_data),
+                    timeout=self.CALL_TIMEOUT
+                )
+            else:  # transcriptions
+                response = self.client.audio.transcriptions.create(
+                    model="whisper-large-v3-turbo",
+                    response_format="text",
+                    prompt=prompt,
+                    file=("audio.wav", audio_data),
+                    timeout=self.CALL_TIMEOUT
+                )
+        except APITimeoutError:
+            raise TimeoutError(f"操作超时 ({self.CALL_TIMEOUT}秒)")
+        return str(response).strip()
 
-        except TimeoutError:
-            error_msg = f"❌ API 请求超时 ({self.timeout_seconds}秒)"
-            logger.error(error_msg)
-            return None, error_msg
-        except Exception as e:
-            error_msg = f"❌ {str(e)}"
-            logger.error(f"音频处理错误: {str(e)}", exc_info=True)
-            return None, error_msg
-        finally:
-            audio_buffer.close()  # 显式关闭字节流
\ No newline at end of file
+    # OpenAI 客户端是同步的，在线程池中调用以免阻塞事件循环。
+    # 请求受 SDK 超时限制，返回时线程已不再读取复用的音频缓冲
+    _call_api = to_thread(_call_whisper_api)
+
+    def _extract_text(self, result):
+        """按需把识别结果转换为简体中文"""
+        return self._convert_traditional_to_simplified(result)
+
+    async def _postprocess(self, text, on_delta=None):
+        """按配置添加标点符号、优化结果"""
+        # 仅在 groq API 时添加标点符号
+        if self.service_platform == "groq" and self.add_symbol:
+            # 只有最后一步的输出才流式输入，避免同一段文本输入两次
+            text = await self.symbol.aadd_symbol(text, None if self.optimize_result else on_delta)
+            logger.info("添加标点符号: %s", text)
+        if self.optimize_result:
+            text = await self.symbol.aoptimize_result(text, on_delta)
+            logger.info("优化结果: %s", text)
+        return text
@@ -0,0 +1,34 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """带过期时间的 LRU 缓存，超出容量时淘汰最久未使用的条目"""
+
+    def __init__(self, maxsize=128, ttl=24 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl  # 条目有效期（秒）
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """获取缓存的值，不存在或已过期时返回 None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        """写入缓存"""
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
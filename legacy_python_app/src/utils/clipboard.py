@@ -0,0 +1,96 @@
+import sys
+import time
+
+# macOS 和 Windows 直接调用系统剪贴板接口，避免 pyperclip 每次读写都启动 pbcopy/pbpaste 子进程；
+# 其他平台（以及缺少 AppKit 时）仍使用 pyperclip
+if sys.platform == "darwin":
+    try:
+        from AppKit import NSPasteboard, NSPasteboardTypeString
+    except ImportError:
+        NSPasteboard = None
+else:
+    NSPasteboard = None
+
+if NSPasteboard is not None:
+    def copy(text):
+        """将文本写入剪贴板"""
+        pasteboard = NSPasteboard.generalPasteboard()
+        pasteboard.clearContents()
+        pasteboard.setString_forType_(text, NSPasteboardTypeString)
+
+    def paste():
+        """读取剪贴板中的文本"""
+        return NSPasteboard.generalPasteboard().stringForType_(NSPasteboardTypeString) or ""
+
+elif sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    CF_UNICODETEXT = 13
+    GMEM_MOVEABLE = 0x0002
+    OPEN_RETRIES = 10  # 剪贴板被其他程序占用时的重试次数
+
+    _user32 = ctypes.WinDLL("user32", use_last_error=True)
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    _user32.OpenClipboard.argtypes = [wintypes.HWND]
+    _user32.OpenClipboard.restype = wintypes.BOOL
+    _user32.CloseClipboard.restype = wintypes.BOOL
+    _user32.EmptyClipboard.restype = wintypes.BOOL
+    _user32.GetClipboardData.argtypes = [wintypes.UINT]
+    _user32.GetClipboardData.restype = wintypes.HANDLE
+    _user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    _user32.SetClipboardData.restype = wintypes.HANDLE
+    _kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    _kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    _kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalFree.restype = wintypes.HGLOBAL
+    _kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalLock.restype = wintypes.LPVOID
+    _kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    _kernel32.GlobalUnlock.restype = wintypes.BOOL
+
+    def _open_clipboard():
+        """打开剪贴板，被其他程序占用时短暂等待后重试"""
+        for _ in range(OPEN_RETRIES):
+            if _user32.OpenClipboard(None):
+                return
+            time.sleep(0.01)
+        raise ctypes.WinError(ctypes.get_last_error())
+
+    def copy(text):
+        """将文本写入剪贴板"""
+        data = ctypes.create_unicode_buffer(text)
+        size = ctypes.sizeof(data)
+        _open_clipboard()
+        try:
+            _user32.EmptyClipboard()
+            handle = _kernel32.GlobalAlloc(GMEM_MOVEABLE, size)
+            if not handle:
+                raise ctypes.WinError(ctypes.get_last_error())
+            ctypes.memmove(_kernel32.GlobalLock(handle), data, size)
+            _kernel32.GlobalUnlock(handle)
+            # 设置成功后内存归系统所有，失败时需要自己释放
+            if not _user32.SetClipboardData(CF_UNICODETEXT, handle):
+                _kernel32.GlobalFree(handle)
+                raise ctypes.WinError(ctypes.get_last_error())
+        finally:
+            _user32.CloseClipboard()
+
+    def paste():
+        """读取剪贴板中的文本"""
+        _open_clipboard()
+        try:
+            handle = _user32.GetClipboardData(CF_UNICODETEXT)
+            if not handle:
+                return ""
+            pointer = _kernel32.GlobalLock(handle)
+            try:
+                return ctypes.wstring_at(pointer)
+            finally:
+                _kernel32.GlobalUnlock(handle)
+        finally:
+            _user32.CloseClipboard()
+
+else:
+    from pyperclip import copy, paste
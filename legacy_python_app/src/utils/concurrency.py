@@ -0,0 +1,33 @@
+import asyncio
+import threading
+from functools import wraps
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    """获取后台事件循环，首次调用时在守护线程中启动"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="async-loop", daemon=True).start()
+        return _loop
+
+
+def run_sync(coro):
+    """在后台事件循环中执行协程并阻塞等待结果
+
+    所有异步客户端都绑定在同一个事件循环上，因此可以跨调用复用连接。
+    不能在后台事件循环线程内部调用，否则会死锁。
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def to_thread(func):
+    """把阻塞的同步函数包装成协程，在线程池中执行以免阻塞事件循环"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.to_thread(func, *args, **kwargs)
+    return wrapper
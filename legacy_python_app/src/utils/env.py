@@ -0,0 +1,9 @@
+import functools
+
+import dotenv
+
+
+@functools.lru_cache(maxsize=1)
+def ensure_env_loaded():
+    """加载 .env 到环境变量，整个进程只读取一次文件"""
+    dotenv.load_dotenv()
@@ -1,49 +1,64 @@
+import atexit
 import logging
 import colorlog
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# 格式化器只需创建一次
+_CONSOLE_FORMATTER = colorlog.ColoredFormatter(
+    fmt='%(asctime)s - %(log_color)s%(levelname)-8s%(reset)s - %(message)s',
+    datefmt='%H:%M:%S',
+    log_colors={
+        'DEBUG':    'cyan',
+        'INFO':     'green',
+        'WARNING': 'yellow',
+        'ERROR':   'red',
+        'CRITICAL': 'red,bg_white',
+    },
+    secondary_log_colors={},
+    style='%'
+)
+_FILE_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(levelname)s - %(message)s'
+)
 
 def setup_logger():
-    """配置彩色日志"""
+    """配置彩色日志，重复调用时直接返回已配置的记录器"""
+    logger = colorlog.getLogger(__name__)
+    if logger.handlers:
+        return logger
+
     # 创建logs目录
     os.makedirs('logs', exist_ok=True)
-    
+
     # 控制台处理器
     console_handler = colorlog.StreamHandler()
-    console_handler.setFormatter(colorlog.ColoredFormatter(
-        fmt='%(asctime)s - %(log_color)s%(levelname)-8s%(reset)s - %(message)s',
-        datefmt='%H:%M:%S',
-        log_colors={
-            'DEBUG':    'cyan',
-            'INFO':     'green',
-            'WARNING': 'yellow',
-            'ERROR':   'red',
-            'CRITICAL': 'red,bg_white',
-        },
-        secondary_log_colors={},
-        style='%'
-    ))
-    
-    # 文件处理器
+    console_handler.setFormatter(_CONSOLE_FORMATTER)
+
+    # 文件处理器，首次写日志时才打开文件
     file_handler = RotatingFileHandler(
         'logs/app.log',
         maxBytes=1024*1024,  # 1MB
         backupCount=5,
         encoding='utf-8',
+        delay=True,
     )
-    file_handler.setFormatter(logging.Formatter(
-        '%(asctime)s - %(levelname)s - %(message)s'
-    ))
-    
-    logger = colorlog.getLogger(__name__)
+    file_handler.setFormatter(_FILE_FORMATTER)
+
+    # 写文件交给后台线程，记录日志时只需入队
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    listener.start()
+    # 退出时写完队列中剩余的日志
+    atexit.register(listener.stop)
+
     logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(QueueHandler(log_queue))
     logger.setLevel(logging.INFO)
-    
-    # 移除可能存在的默认处理器
-    for handler in logger.handlers[:-2]:
-        logger.removeHandler(handler)
-    
+    # 已由自己的处理器输出，不再传给根记录器重复格式化
+    logger.propagate = False
+
     return logger
 
 logger = setup_logger()